@@ -1,24 +1,217 @@
 # app.py
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, url_for
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+import orjson
 import sqlite3
-import os
 import csv
-import io
+import operator
+import threading
+import os
+import time
+import atexit
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import pyarrow
+    import pyarrow.csv as pacsv
+except ImportError:  # pyarrow 为可选依赖，未安装时只使用标准库 csv
+    pacsv = None
+
+
+class OrjsonProvider(JSONProvider):
+    # 用 orjson 替换标准库 json，加快大列表的序列化
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # 直接把 orjson 生成的 bytes 作为响应体，省去一次解码
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype="application/json")
+
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+# 请求体大小上限（主要限制 CSV 上传），超出时直接返回 413
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get("PHONEBOOK_MAX_UPLOAD_MB", "32")) * 1024 * 1024
 CORS(app)
 
 DB_PATH = "contacts.db"
 
+# PHONEBOOK_IN_MEMORY=1 时整个数据库放在内存中（memdb VFS，需要 SQLite 3.36+），
+# 启动时从 DB_PATH 载入，之后每隔 PHONEBOOK_SNAPSHOT_INTERVAL 秒以及进程退出时备份回磁盘。
+# 进程崩溃会丢失最近一次备份之后的写入，且数据不在进程间共享，只能以单个工作进程运行。
+IN_MEMORY = os.environ.get("PHONEBOOK_IN_MEMORY") == "1"
+SNAPSHOT_INTERVAL = float(os.environ.get("PHONEBOOK_SNAPSHOT_INTERVAL", "30"))
+MEMORY_DB_URI = "file:/phonebook.db?vfs=memdb"
 
-def init_db():
-    if os.path.exists(DB_PATH):
+# 后台导入任务超过这么多秒仍未结束（或所在进程已退出）即视为中断；已结束的任务保留一天后清理
+IMPORT_JOB_TIMEOUT = 600
+IMPORT_JOB_RETENTION = 24 * 3600
+
+# WAL 模式下 synchronous=NORMAL 不会在每次提交时 fsync，读写也可以并发进行；
+# foreign_keys 是连接级设置，不打开的话 ON DELETE CASCADE 不会生效
+DB_PRAGMAS = """
+    PRAGMA journal_mode = WAL;
+    PRAGMA synchronous = NORMAL;
+    PRAGMA temp_store = MEMORY;
+    PRAGMA cache_size = -64000;
+    PRAGMA mmap_size = 134217728;
+    PRAGMA busy_timeout = 5000;
+    PRAGMA foreign_keys = ON;
+"""
+
+# RETURNING 需要 SQLite 3.35+，更早的版本退回到先 UPDATE 再 SELECT
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# 处理函数里反复执行的 SQL 统一定义为常量，保证命中连接的预编译语句缓存
+_SQL_CONTACTS_JOIN = (
+    "SELECT c.id, c.name, c.address, c.is_favorite, m.method_type, m.value "
+    "FROM contacts c LEFT JOIN contact_methods m ON m.contact_id = c.id "
+)
+SQL_LIST_CONTACTS = _SQL_CONTACTS_JOIN + "ORDER BY c.id, m.id"
+SQL_LIST_FAVORITES = _SQL_CONTACTS_JOIN + "WHERE c.is_favorite = 1 ORDER BY c.id, m.id"
+SQL_INS_CONTACT = "INSERT INTO contacts (name, address) VALUES (?, ?)"
+SQL_UPD_CONTACT = "UPDATE contacts SET name = ?, address = ? WHERE id = ?"
+SQL_UPD_CONTACT_RETURNING = SQL_UPD_CONTACT + " RETURNING is_favorite"
+SQL_DEL_CONTACT = "DELETE FROM contacts WHERE id = ?"
+SQL_GET_FAVORITE = "SELECT is_favorite FROM contacts WHERE id = ?"
+SQL_TOGGLE_FAVORITE = "UPDATE contacts SET is_favorite = CASE WHEN is_favorite = 1 THEN 0 ELSE 1 END WHERE id = ?"
+SQL_TOGGLE_FAVORITE_RETURNING = SQL_TOGGLE_FAVORITE + " RETURNING is_favorite"
+SQL_INS_METHOD = "INSERT INTO contact_methods (contact_id, method_type, value) VALUES (?, ?, ?)"
+SQL_DEL_METHODS = "DELETE FROM contact_methods WHERE contact_id = ?"
+SQL_LAST_ROWID = "SELECT last_insert_rowid()"
+# CSV 导入先整批写入临时表，再由 INSERT ... SELECT 在 SQLite 内部生成联系人和联系方式
+SQL_CREATE_IMPORT_ROWS = "CREATE TEMP TABLE IF NOT EXISTS import_rows (name TEXT, phone TEXT, email TEXT, address TEXT)"
+SQL_INS_IMPORT_ROW = "INSERT INTO temp.import_rows (name, phone, email, address) VALUES (?, ?, ?, ?)"
+SQL_IMPORT_CONTACTS = "INSERT INTO contacts (name, address) SELECT name, NULLIF(address, '') FROM temp.import_rows ORDER BY rowid"
+SQL_IMPORT_METHODS = (
+    "INSERT INTO contact_methods (contact_id, method_type, value) "
+    "SELECT ?1 + rowid, 'phone', phone FROM temp.import_rows WHERE phone <> '' "
+    "UNION ALL SELECT ?1 + rowid, 'email', email FROM temp.import_rows WHERE email <> '' "
+    "UNION ALL SELECT ?1 + rowid, 'address', address FROM temp.import_rows WHERE address <> ''"
+)
+SQL_CLEAR_IMPORT_ROWS = "DELETE FROM temp.import_rows"
+SQL_INS_IMPORT_JOB = "INSERT INTO import_jobs (id, status, pid, updated_at) VALUES (?, 'pending', ?, ?)"
+# 状态只能按 pending → running → done 推进，已被判定为中断（failed）的任务不会再被改写
+SQL_START_IMPORT_JOB = "UPDATE import_jobs SET status = 'running', updated_at = ? WHERE id = ? AND status = 'pending'"
+SQL_FINISH_IMPORT_JOB = (
+    "UPDATE import_jobs SET status = 'done', count = ?, updated_at = ? "
+    "WHERE id = ? AND status = 'running'"
+)
+SQL_GET_IMPORT_JOB = "SELECT status, count, error, pid, updated_at FROM import_jobs WHERE id = ?"
+SQL_UNFINISHED_IMPORT_JOBS = "SELECT id, pid, updated_at FROM import_jobs WHERE status IN ('pending', 'running')"
+SQL_FAIL_IMPORT_JOB = (
+    "UPDATE import_jobs SET status = 'failed', error = ?, updated_at = ? "
+    "WHERE id = ? AND status IN ('pending', 'running')"
+)
+SQL_PRUNE_IMPORT_JOBS = "DELETE FROM import_jobs WHERE status IN ('done', 'failed') AND updated_at < ?"
+SQL_GET_REVISION = "SELECT epoch, value FROM revision"
+SQL_BUMP_REVISION = "UPDATE revision SET value = value + 1"
+
+# CSV 导入必须包含的列，按 (姓名, 电话, 邮箱, 住址) 的顺序取值
+CSV_COLUMNS = ('姓名', '电话', '邮箱', '住址')
+REQUIRED_FIELDS = frozenset(CSV_COLUMNS)
+_get_csv_columns = operator.itemgetter(*CSV_COLUMNS)
+
+
+def _connect():
+    if IN_MEMORY:
+        conn = sqlite3.connect(MEMORY_DB_URI, uri=True, cached_statements=256)
+    else:
+        conn = sqlite3.connect(DB_PATH, cached_statements=256)
+    conn.executescript(DB_PRAGMAS)
+    return conn
+
+
+# 每个工作线程复用同一个连接，保留 SQLite 的页缓存和语句缓存
+_local = threading.local()
+
+
+def get_db():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = _connect()
+    return conn
+
+
+@app.teardown_appcontext
+def rollback_db(exc):
+    # 连接不在请求结束时关闭，只回滚处理函数遗留的未提交事务
+    conn = getattr(_local, "conn", None)
+    if conn is not None and conn.in_transaction:
+        conn.rollback()
+
+
+_memory_keeper = None
+_snapshot_lock = threading.Lock()
+_snapshot_version = None
+_snapshot_thread = None
+
+
+def _open_memory_db():
+    global _memory_keeper
+    if _memory_keeper is not None:
+        return False
+    # 内存库在最后一个连接关闭时即被销毁，保留一个常驻连接，同时用它做备份
+    _memory_keeper = sqlite3.connect(MEMORY_DB_URI, uri=True, check_same_thread=False)
+    disk = sqlite3.connect(DB_PATH)
+    try:
+        # memdb 打不开 WAL 格式的库，载入前先把磁盘文件切回回滚日志模式
+        disk.execute("PRAGMA journal_mode = DELETE")
+        disk.backup(_memory_keeper)
+    finally:
+        disk.close()
+    return True
+
+
+def snapshot_memory_db():
+    global _snapshot_version
+    with _snapshot_lock:
+        # data_version 只在其他连接提交写入后才变化，没有新写入时跳过备份
+        version = _memory_keeper.execute("PRAGMA data_version").fetchone()[0]
+        if version == _snapshot_version:
+            return
+        disk = sqlite3.connect(DB_PATH)
+        try:
+            _memory_keeper.backup(disk)
+        finally:
+            disk.close()
+        _snapshot_version = version
+
+
+def _snapshot_loop():
+    while True:
+        time.sleep(SNAPSHOT_INTERVAL)
+        try:
+            snapshot_memory_db()
+        except sqlite3.Error as e:
+            print("备份错误:", e)
+
+
+def _start_snapshots():
+    global _snapshot_version, _snapshot_thread
+    if _snapshot_thread is not None:
         return
-    conn = sqlite3.connect(DB_PATH)
+    # 以载入并初始化之后的状态为基准，之后有新的写入才会备份
+    _snapshot_version = _memory_keeper.execute("PRAGMA data_version").fetchone()[0]
+    _snapshot_thread = threading.Thread(target=_snapshot_loop, daemon=True)
+    _snapshot_thread.start()
+    atexit.register(snapshot_memory_db)
+
+
+def init_db():
+    loaded = IN_MEMORY and _open_memory_db()
+    # 全部使用 IF NOT EXISTS，已有数据库启动时也会补上缺失的索引
+    conn = _connect()
     cursor = conn.cursor()
     cursor.execute("""
-        CREATE TABLE contacts (
+        CREATE TABLE IF NOT EXISTS contacts (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT NOT NULL,
             address TEXT,
@@ -26,7 +219,7 @@ def init_db():
         )
     """)
     cursor.execute("""
-        CREATE TABLE contact_methods (
+        CREATE TABLE IF NOT EXISTS contact_methods (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             contact_id INTEGER NOT NULL,
             method_type TEXT NOT NULL,
@@ -34,43 +227,117 @@ def init_db():
             FOREIGN KEY (contact_id) REFERENCES contacts(id) ON DELETE CASCADE
         )
     """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_methods_contact ON contact_methods(contact_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_contacts_fav ON contacts(is_favorite) WHERE is_favorite = 1")
+    # 每个写操作都会在同一事务里递增的版本号，列表接口据此判断缓存是否过期；
+    # 存在数据库中而不是进程内，多个工作进程之间也能正确失效。
+    # epoch 是建库时生成的随机串，与版本号一起组成 ETag：库被删除重建后版本号从 0 重来，
+    # 内存模式崩溃后会回到上次快照的版本号，换了 epoch 浏览器缓存的旧 ETag 就不会再命中
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS revision (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            value INTEGER NOT NULL,
+            epoch TEXT NOT NULL
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO revision (id, value, epoch) VALUES (1, 0, ?)", (uuid.uuid4().hex,))
+    if loaded:
+        # 从磁盘快照载入的内存库可能落后于崩溃前的状态，换一个 epoch
+        cursor.execute("UPDATE revision SET epoch = ?", (uuid.uuid4().hex,))
+    # 后台 CSV 导入任务的状态，同样放在库里，任意工作进程都能查询；
+    # pid 和 updated_at 用来识别所在进程已退出、永远不会结束的任务
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS import_jobs (
+            id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            count INTEGER,
+            error TEXT,
+            pid INTEGER,
+            updated_at REAL NOT NULL
+        )
+    """)
+    now = time.time()
+    cursor.executemany(SQL_FAIL_IMPORT_JOB, [
+        (IMPORT_JOB_LOST, now, job_id)
+        for job_id, pid, updated_at in cursor.execute(SQL_UNFINISHED_IMPORT_JOBS).fetchall()
+        if _import_job_lost(pid, updated_at, now)
+    ])
+    cursor.execute(SQL_PRUNE_IMPORT_JOBS, (now - IMPORT_JOB_RETENTION,))
+    # 清理外键未开启时删除联系人所遗留的联系方式
+    cursor.execute("DELETE FROM contact_methods WHERE contact_id NOT IN (SELECT id FROM contacts)")
     conn.commit()
     conn.close()
+    if IN_MEMORY:
+        _start_snapshots()
 
 
-def get_contact_with_methods(cursor, contact_row):
-    contact_id, name, address, is_favorite = contact_row
-    methods = cursor.execute(
-        "SELECT method_type, value FROM contact_methods WHERE contact_id = ?",
-        (contact_id,)
-    ).fetchall()
-    return {
-        "id": contact_id,
-        "name": name,
-        "address": address,
-        "is_favorite": bool(is_favorite),
-        "methods": [{"type": m[0], "value": m[1]} for m in methods]
-    }
+def fetch_contacts(cursor, sql):
+    # 一次 LEFT JOIN 取出联系人及其全部联系方式，再按 id 归并
+    # 行保持默认的元组并按位置解包；sqlite3.Row 构造开销更大，实测并不更快
+    rows = cursor.execute(sql)
+    result = {}
+    for contact_id, name, address, is_favorite, method_type, value in rows:
+        contact = result.get(contact_id)
+        if contact is None:
+            contact = result[contact_id] = {
+                "id": contact_id,
+                "name": name,
+                "address": address,
+                "is_favorite": bool(is_favorite),
+                "methods": []
+            }
+        if method_type is not None:
+            contact["methods"].append({"type": method_type, "value": value})
+    return list(result.values())
+
+
+# 列表接口序列化后的响应体：{sql: (etag, body)}
+_listing_cache = {}
+
+
+def listing_response(sql):
+    cursor = get_db().cursor()
+    # 先读版本号再读数据：并发写入时最多把新数据记在旧版本号下，下次请求会重新生成
+    epoch, revision = cursor.execute(SQL_GET_REVISION).fetchone()
+    etag = f"{epoch}-{revision}"
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        cached = _listing_cache.get(sql)
+        if cached is None or cached[0] != etag:
+            cached = _listing_cache[sql] = (etag, orjson.dumps(fetch_contacts(cursor, sql)))
+        response = app.response_class(cached[1], mimetype="application/json")
+    response.set_etag(etag)
+    # 浏览器每次都带 If-None-Match 回来验证，数据未变时只返回 304
+    response.cache_control.no_cache = True
+    return response
 
 
 @app.route('/contacts', methods=['GET'])
 def get_contacts():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    rows = cursor.execute("SELECT id, name, address, is_favorite FROM contacts").fetchall()
-    result = [get_contact_with_methods(cursor, row) for row in rows]
-    conn.close()
-    return jsonify(result)
+    return listing_response(SQL_LIST_CONTACTS)
 
 
 @app.route('/contacts/favorites', methods=['GET'])
 def get_favorites():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    rows = cursor.execute("SELECT id, name, address, is_favorite FROM contacts WHERE is_favorite = 1").fetchall()
-    result = [get_contact_with_methods(cursor, row) for row in rows]
-    conn.close()
-    return jsonify(result)
+    return listing_response(SQL_LIST_FAVORITES)
+
+
+def update_contact_row(cursor, sql, returning_sql, params):
+    """执行对单个联系人（id 为最后一个参数）的 UPDATE，返回 (is_favorite,)；联系人不存在时返回 None"""
+    if SQLITE_HAS_RETURNING:
+        return cursor.execute(returning_sql, params).fetchone()
+    cursor.execute(sql, params)
+    if not cursor.rowcount:
+        return None
+    return cursor.execute(SQL_GET_FAVORITE, (params[-1],)).fetchone()
+
+
+def _norm(value):
+    # 客户端一般直接传字符串，此时不必再经过 str() 转换
+    if isinstance(value, str):
+        return value.strip()
+    return str(value).strip() if value is not None else None
 
 
 @app.route('/contacts', methods=['POST'])
@@ -79,28 +346,29 @@ def add_contact():
     if not data:
         return jsonify({"error": "请求体不能为空"}), 400
     name = data.get('name', '').strip()
-    raw_address = data.get('address')
-    address = str(raw_address).strip() if raw_address is not None else None
+    address = _norm(data.get('address'))
     methods = data.get('methods', [])
     if not name:
         return jsonify({"error": "姓名不能为空"}), 400
     if not isinstance(methods, list) or len(methods) == 0:
         return jsonify({"error": "至少需要一个联系方式"}), 400
+    rows = []
     for m in methods:
-        if not m.get('type') or not m.get('value'):
+        method_type, value = m.get('type'), m.get('value')
+        if not method_type or not value:
             return jsonify({"error": "每个联系方式必须包含 type 和 value"}), 400
+        rows.append((method_type, value))
 
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO contacts (name, address) VALUES (?, ?)", (name, address))
-    contact_id = cursor.lastrowid
-    for m in methods:
-        cursor.execute(
-            "INSERT INTO contact_methods (contact_id, method_type, value) VALUES (?, ?, ?)",
-            (contact_id, m['type'], m['value'])
-        )
-    conn.commit()
-    conn.close()
+    conn = get_db()
+    # with 块内的语句在同一个事务中提交，出错时整体回滚
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute(SQL_INS_CONTACT, (name, address))
+        contact_id = cursor.lastrowid
+        # SQLite 的 WITH 子句里不能写 INSERT；改用 json_each 一次插入在常见的 1~3 个
+        # 联系方式下实测比复用同一预编译语句的 executemany 更慢，因此保持这两步
+        cursor.executemany(SQL_INS_METHOD, ((contact_id, t, v) for t, v in rows))
+        cursor.execute(SQL_BUMP_REVISION)
     return jsonify({
         "id": contact_id,
         "name": name,
@@ -116,48 +384,49 @@ def update_contact(contact_id):
     if not data:
         return jsonify({"error": "请求体不能为空"}), 400
     name = data.get('name', '').strip()
-    raw_address = data.get('address')
-    address = str(raw_address).strip() if raw_address is not None else None
+    address = _norm(data.get('address'))
     methods = data.get('methods', [])
     if not name:
         return jsonify({"error": "姓名不能为空"}), 400
     if not isinstance(methods, list):
         return jsonify({"error": "methods 必须是数组"}), 400
 
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    exists = cursor.execute("SELECT 1 FROM contacts WHERE id = ?", (contact_id,)).fetchone()
-    if not exists:
-        conn.close()
-        return jsonify({"error": "联系人不存在"}), 404
-
-    cursor.execute("UPDATE contacts SET name = ?, address = ? WHERE id = ?", (name, address, contact_id))
-    cursor.execute("DELETE FROM contact_methods WHERE contact_id = ?", (contact_id,))
+    rows = []
     for m in methods:
-        if m.get('type') and m.get('value'):
-            cursor.execute(
-                "INSERT INTO contact_methods (contact_id, method_type, value) VALUES (?, ?, ?)",
-                (contact_id, m['type'], m['value'])
-            )
-    conn.commit()
-    conn.close()
+        method_type, value = m.get('type'), m.get('value')
+        if method_type and value:
+            rows.append((contact_id, method_type, value))
+
+    conn = get_db()
+    with conn:
+        cursor = conn.cursor()
+        # UPDATE 本身即可判断联系人是否存在，同时取回收藏状态
+        row = update_contact_row(
+            cursor, SQL_UPD_CONTACT, SQL_UPD_CONTACT_RETURNING, (name, address, contact_id)
+        )
+        if row is None:
+            return jsonify({"error": "联系人不存在"}), 404
+        cursor.execute(SQL_DEL_METHODS, (contact_id,))
+        cursor.executemany(SQL_INS_METHOD, rows)
+        cursor.execute(SQL_BUMP_REVISION)
     return jsonify({
         "id": contact_id,
         "name": name,
         "address": address,
-        "is_favorite": bool(exists),
+        "is_favorite": bool(row[0]),
         "methods": methods
     })
 
 
 @app.route('/contacts/<int:contact_id>', methods=['DELETE'])
 def delete_contact(contact_id):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM contacts WHERE id = ?", (contact_id,))
-    conn.commit()
-    deleted = cursor.rowcount > 0
-    conn.close()
+    conn = get_db()
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute(SQL_DEL_CONTACT, (contact_id,))
+        deleted = cursor.rowcount > 0
+        if deleted:
+            cursor.execute(SQL_BUMP_REVISION)
     if not deleted:
         return jsonify({"error": "联系人不存在"}), 404
     return jsonify({"message": "删除成功"}), 200
@@ -165,17 +434,143 @@ def delete_contact(contact_id):
 
 @app.route('/contacts/<int:contact_id>/favorite', methods=['PUT'])
 def toggle_favorite(contact_id):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    row = cursor.execute("SELECT is_favorite FROM contacts WHERE id = ?", (contact_id,)).fetchone()
-    if not row:
-        conn.close()
+    conn = get_db()
+    # 单条 UPDATE 完成取反，避免先查后改之间被其他请求插入
+    with conn:
+        cursor = conn.cursor()
+        row = update_contact_row(cursor, SQL_TOGGLE_FAVORITE, SQL_TOGGLE_FAVORITE_RETURNING, (contact_id,))
+        if row is not None:
+            cursor.execute(SQL_BUMP_REVISION)
+    if row is None:
         return jsonify({"error": "联系人不存在"}), 404
-    new_status = 0 if row[0] == 1 else 1
-    cursor.execute("UPDATE contacts SET is_favorite = ? WHERE id = ?", (new_status, contact_id))
-    conn.commit()
-    conn.close()
-    return jsonify({"is_favorite": bool(new_status)})
+    return jsonify({"is_favorite": bool(row[0])})
+
+
+def _clean_csv_rows(records):
+    rows = []
+    append = rows.append
+    for name, phone, email, address in records:
+        name = (name or '').strip()
+        if not name:
+            continue  # 跳过空行
+        append((name, (phone or '').strip(), (email or '').strip(), (address or '').strip()))
+    return rows
+
+
+def _read_csv_records_arrow(path):
+    # pyarrow 的 C++ 解析器按块读取，每块直接取出所需的几列
+    reader = pacsv.open_csv(
+        path,
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=list(CSV_COLUMNS),
+            column_types={c: pyarrow.string() for c in CSV_COLUMNS}
+        )
+    )
+    for batch in reader:
+        yield from zip(*(column.to_pylist() for column in batch.columns))
+
+
+def read_csv_rows(path):
+    """解析上传的 CSV，返回 (姓名, 电话, 邮箱, 住址) 元组列表；缺少必要列时返回 None"""
+    if pacsv is not None:
+        try:
+            return _clean_csv_rows(_read_csv_records_arrow(path))
+        except pyarrow.ArrowException:
+            # 缺列、列数不齐、编码错误等情况交给更宽松的标准库重新解析
+            pass
+
+    # newline='' 把换行交给 csv 模块处理，否则 \x0c、U+2028 等字符也会被当作行尾，
+    # 把一条记录拆成两条；utf-8-sig 会自动去掉 BOM
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        if not REQUIRED_FIELDS.issubset(reader.fieldnames or ()):
+            return None
+        # DictReader 会为缺失的值补 None，表头校验通过后每行都有这几个键，可一次取出
+        return _clean_csv_rows(map(_get_csv_columns, reader))
+
+
+@app.errorhandler(413)
+def request_too_large(e):
+    return jsonify({"error": f"文件过大，不能超过 {app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)} MB"}), 413
+
+
+def read_csv_header(path):
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        return next(csv.reader(f), None) or []
+
+
+def import_rows(conn, rows):
+    """把解析好的 (姓名, 电话, 邮箱, 住址) 写入数据库，返回导入的联系人数；事务由调用方提交"""
+    count = len(rows)
+    if not count:
+        return 0
+    cursor = conn.cursor()
+    cursor.execute(SQL_CREATE_IMPORT_ROWS)
+    # 整批数据放在一个写事务里，临时表也随事务回滚，失败时不会残留数据
+    cursor.execute("BEGIN IMMEDIATE")
+    cursor.executemany(SQL_INS_IMPORT_ROW, rows)
+    cursor.execute(SQL_IMPORT_CONTACTS)
+    # 写锁期间自增 id 是连续的：临时表第 n 行对应的联系人 id 为 base + n
+    base = cursor.execute(SQL_LAST_ROWID).fetchone()[0] - count
+    cursor.execute(SQL_IMPORT_METHODS, (base,))
+    cursor.execute(SQL_CLEAR_IMPORT_ROWS)
+    cursor.execute(SQL_BUMP_REVISION)
+    return count
+
+
+IMPORT_JOB_LOST = "导入任务已中断，请重新上传"
+
+
+def _import_job_lost(pid, updated_at, now=None):
+    # 未结束的任务超时，或所在进程已不存在，都不可能再完成
+    if (now or time.time()) - updated_at > IMPORT_JOB_TIMEOUT:
+        return True
+    # Windows 上 os.kill 会直接结束目标进程，只在 POSIX 上探测进程是否存活
+    if pid is None or os.name != 'posix' or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        pass
+    return False
+
+
+# 导入任务在后台线程中串行执行，避免多个大文件同时争抢写锁
+_import_executor = ThreadPoolExecutor(max_workers=1)
+
+
+def _run_import(job_id, path):
+    conn = get_db()
+    try:
+        with conn:
+            started = conn.execute(SQL_START_IMPORT_JOB, (time.time(), job_id)).rowcount
+        if not started:
+            # 排队期间已被判定为中断，用户会重新上传，这里不能再导入一遍
+            return
+        rows = read_csv_rows(path)
+        if rows is None:
+            raise ValueError(f"缺少必要列：{set(REQUIRED_FIELDS)}")
+        count = import_rows(conn, rows)
+        # done 与导入的数据在同一事务中提交，两者不会只成功一半；
+        # 运行期间被判定为中断的任务把整批数据回滚
+        if not conn.execute(SQL_FINISH_IMPORT_JOB, (count, time.time(), job_id)).rowcount:
+            conn.rollback()
+            return
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print("导入错误:", e)
+        if isinstance(e, UnicodeDecodeError):
+            error = "文件编码必须为 UTF-8"
+        else:
+            error = f"文件解析失败：{str(e)}"
+        with conn:
+            conn.execute(SQL_FAIL_IMPORT_JOB, (error, time.time(), job_id))
+    finally:
+        os.remove(path)
 
 
 # ✅ 新增：CSV 导入接口
@@ -189,54 +584,61 @@ def import_contacts():
     if not file.filename.lower().endswith('.csv'):
         return jsonify({"error": "仅支持 .csv 文件"}), 400
 
+    # 先落盘并校验表头，文件内容的解析和写库交给后台线程，请求立即返回 202
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
     try:
-        # 自动处理 UTF-8 with BOM
-        content = file.read()
-        if content.startswith(b'\xef\xbb\xbf'):
-            text = content[3:].decode('utf-8')
-        else:
-            text = content.decode('utf-8')
-
-        reader = csv.DictReader(io.StringIO(text))
-        required_fields = {'姓名', '电话', '邮箱', '住址'}
-        if not required_fields.issubset(set(reader.fieldnames or [])):
-            return jsonify({"error": f"缺少必要列：{required_fields}"}), 400
-
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        count = 0
-        for row in reader:
-            name = (row.get('姓名') or '').strip()
-            if not name:
-                continue  # 跳过空行
-            phone = (row.get('电话') or '').strip()
-            email = (row.get('邮箱') or '').strip()
-            address = (row.get('住址') or '').strip()
-
-            cursor.execute("INSERT INTO contacts (name, address) VALUES (?, ?)", (name, address or None))
-            contact_id = cursor.lastrowid
-            if phone:
-                cursor.execute("INSERT INTO contact_methods (contact_id, method_type, value) VALUES (?, ?, ?)",
-                               (contact_id, 'phone', phone))
-            if email:
-                cursor.execute("INSERT INTO contact_methods (contact_id, method_type, value) VALUES (?, ?, ?)",
-                               (contact_id, 'email', email))
-            if address:
-                cursor.execute("INSERT INTO contact_methods (contact_id, method_type, value) VALUES (?, ?, ?)",
-                               (contact_id, 'address', address))
-            count += 1
-
-        conn.commit()
-        conn.close()
-        return jsonify({"message": f"成功导入 {count} 条联系人"}), 200
-
+        file.save(path)
+        header = read_csv_header(path)
     except Exception as e:
+        os.remove(path)
         print("导入错误:", e)
+        if isinstance(e, UnicodeDecodeError):
+            return jsonify({"error": "文件编码必须为 UTF-8"}), 400
         return jsonify({"error": f"文件解析失败：{str(e)}"}), 400
+    if not REQUIRED_FIELDS.issubset(header):
+        os.remove(path)
+        return jsonify({"error": f"缺少必要列：{set(REQUIRED_FIELDS)}"}), 400
+
+    job_id = uuid.uuid4().hex
+    try:
+        conn = get_db()
+        now = time.time()
+        with conn:
+            conn.execute(SQL_PRUNE_IMPORT_JOBS, (now - IMPORT_JOB_RETENTION,))
+            conn.execute(SQL_INS_IMPORT_JOB, (job_id, os.getpid(), now))
+        _import_executor.submit(_run_import, job_id, path)
+    except Exception:
+        # 任务没交给后台线程，临时文件不会再有人清理
+        os.remove(path)
+        raise
+    return jsonify({
+        "job_id": job_id,
+        "status_url": url_for('get_import_job', job_id=job_id)
+    }), 202
+
+
+@app.route('/imports/<job_id>', methods=['GET'])
+def get_import_job(job_id):
+    conn = get_db()
+    row = conn.execute(SQL_GET_IMPORT_JOB, (job_id,)).fetchone()
+    if row is None:
+        return jsonify({"error": "导入任务不存在"}), 404
+    status, count, error, pid, updated_at = row
+    if status in ('pending', 'running') and _import_job_lost(pid, updated_at):
+        with conn:
+            conn.execute(SQL_FAIL_IMPORT_JOB, (IMPORT_JOB_LOST, time.time(), job_id))
+        # 条件更新：任务恰好在此期间结束时以它自己写入的结果为准
+        status, count, error = conn.execute(SQL_GET_IMPORT_JOB, (job_id,)).fetchone()[:3]
+    result = {"job_id": job_id, "status": status, "count": count, "error": error}
+    if status == 'done':
+        result["message"] = f"成功导入 {count} 条联系人"
+    return jsonify(result)
 
 
 if __name__ == '__main__':
     init_db()
     print("✅ 数据库初始化完成")
     print("🚀 后端服务启动中... 访问 http://127.0.0.1:5000/contacts 查看数据")
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    # 仅用于本地开发，调试模式通过 FLASK_DEBUG=1 开启；生产环境请使用 wsgi.py + gunicorn
+    app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
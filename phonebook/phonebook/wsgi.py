@@ -0,0 +1,6 @@
+# wsgi.py
+# 生产环境入口：gunicorn -w 2 --threads 8 -b 0.0.0.0:5000 wsgi:application
+from app import app, init_db
+
+init_db()
+application = app